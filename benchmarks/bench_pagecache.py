@@ -0,0 +1,184 @@
+"""Page-cache footprint of large transfers for ROM Downloader.
+
+Copies one large ROM through download_with_progress (and download_sftp_file
+against the local SFTP server from sftp_server.py when paramiko is available),
+once with the app's write-behind cache dropping and once without, sampling
+/proc/meminfo every 20 ms:
+
+    python benchmarks/bench_pagecache.py --size-mb 2048
+    python benchmarks/bench_pagecache.py --window-mb 16 --no-writeback
+
+Reports per mode the peak growth of the page cache (Cached) and of dirty +
+writeback memory over the copy, how much of the finished file is still cached
+(fincore), and the copy rate. The source file is dropped from the cache before
+every run so only the destination's pages differ between modes. For the SFTP
+copy the server reads that source on this machine too, so its pages (about the
+file size) show up in the cache growth of both modes. Linux only.
+
+No display needed: the copies run on a windowless app (benchutil.headless_app).
+"""
+import argparse
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import benchutil
+
+MEMINFO_KEYS = ("Cached", "Dirty", "Writeback")
+
+
+def meminfo():
+    """The MEMINFO_KEYS fields of /proc/meminfo, in bytes."""
+    values = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in MEMINFO_KEYS:
+                values[key] = int(rest.split()[0]) * 1024
+    return values
+
+
+class Sampler(threading.Thread):
+    """Track the peak page-cache and dirty/writeback growth over a baseline."""
+
+    def __init__(self, interval=0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.base = meminfo()
+        self.peak_cached = 0
+        self.peak_dirty = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        now = meminfo()
+        self.peak_cached = max(self.peak_cached, now["Cached"] - self.base["Cached"])
+        self.peak_dirty = max(self.peak_dirty, now["Dirty"] + now["Writeback"]
+                              - self.base["Dirty"] - self.base["Writeback"])
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+
+def cached_bytes(path):
+    """Bytes of path resident in the page cache, per util-linux fincore (None without it)."""
+    if not shutil.which("fincore"):
+        return None
+    out = subprocess.run(["fincore", "--bytes", "--noheadings", "--output", "RES", path],
+                         capture_output=True, text=True)
+    return int(out.stdout.split()[0]) if out.returncode == 0 and out.stdout.strip() else None
+
+
+def drop_cache(path):
+    with open(path, "rb") as f:
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def measure(copy, source, dest, size, repeat):
+    """Run copy(dest) repeat times; return the per-run memory peaks and rates."""
+    cached, dirty, resident, mbps = [], [], [], []
+    for _ in range(repeat):
+        drop_cache(source)
+        os.sync()
+        sampler = Sampler()
+        sampler.start()
+        start = time.perf_counter()
+        copy(dest)
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        if os.path.getsize(dest) != size:
+            raise RuntimeError("incomplete copy")
+        cached.append(sampler.peak_cached / (1024 * 1024))
+        dirty.append(sampler.peak_dirty / (1024 * 1024))
+        left = cached_bytes(dest)
+        if left is not None:
+            resident.append(left / (1024 * 1024))
+        mbps.append(size / (1024 * 1024) / elapsed)
+        os.remove(dest)
+    return {'peak_cache_growth_mb': benchutil.percentiles(cached),
+            'peak_dirty_mb': benchutil.percentiles(dirty),
+            'dest_resident_mb': benchutil.percentiles(resident),
+            'mb_per_s': benchutil.percentiles(mbps)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024, help="size of the copied ROM")
+    parser.add_argument("--window-mb", type=int, help="override CACHE_DROP_WINDOW")
+    parser.add_argument("--no-writeback", action="store_true",
+                        help="fadvise only, no sync_file_range (CACHE_WRITEBACK off)")
+    parser.add_argument("--no-sftp", action="store_true", help="skip the SFTP copy")
+    benchutil.add_common_args(parser)
+    args = parser.parse_args()
+    if not sys.platform.startswith("linux"):
+        sys.exit("bench_pagecache reads /proc/meminfo and needs Linux")
+
+    scratch = benchutil.isolate_home()
+    rd = benchutil.import_app()
+    served = os.path.join(scratch, "served")
+    os.makedirs(served)
+    filename = "Huge Game (USA).iso"
+    source = os.path.join(served, filename)
+    size = args.size_mb * 1024 * 1024
+    print("Generating ROM...", file=sys.stderr)
+    with open(source, "wb") as f:
+        for _ in range(args.size_mb // 4):
+            f.write(os.urandom(4 * 1024 * 1024))
+    dest = os.path.join(scratch, filename)
+
+    app, root = benchutil.headless_app(rd)
+    if args.window_mb:
+        app.CACHE_DROP_WINDOW = args.window_mb * 1024 * 1024
+    app.CACHE_WRITEBACK = not args.no_writeback
+
+    server = None
+    if not args.no_sftp and rd._load_paramiko():
+        from sftp_server import LocalSFTPServer
+        server = LocalSFTPServer(served).__enter__()
+        if not app.connect_sftp(server.connection_info()):
+            sys.exit("could not connect to the local SFTP server")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'app_version': rd.APP_VERSION,
+        'bytes': size,
+        'window_mb': app.CACHE_DROP_WINDOW / (1024 * 1024),
+        'writeback': bool(app.CACHE_WRITEBACK and rd._sync_file_range()),
+        'results': {},
+    }
+    app.cancel_download_flag = False
+    for dropping in (True, False):
+        app.CACHE_DROP_MIN_BYTES = 0 if dropping else float("inf")
+        mode = "write_behind" if dropping else "default"
+        print(f"Copying with {mode}...", file=sys.stderr)
+        app.connection_type = "smb"
+        report['results'][f"local_{mode}"] = measure(
+            lambda out: app.download_with_progress(source, out, filename, 1, 1),
+            source, dest, size, args.repeat)
+        root.update()
+        if server:
+            app.connection_type = "sftp"
+            report['results'][f"sftp_{mode}"] = measure(
+                lambda out: app.download_sftp_file("/" + filename, out, filename, 1, 1),
+                source, dest, size, args.repeat)
+            root.update()
+    if server:
+        app.disconnect_sftp()
+        server.stop()
+    root.destroy()
+
+    benchutil.finish(report, args, higher_is_better=("mb_per_s",))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""SFTP transfer throughput benchmarks for ROM Downloader.
+
+Starts a local paramiko SFTP server (see sftp_server.py) over generated ROM
+trees and drives the app's own transfer code against it, once per link profile:
+
+    python benchmarks/bench_transfer.py --latency-ms 0 20 80 --bandwidth-mbps 0 50
+    python benchmarks/bench_transfer.py --baseline bench_transfer.json
+
+Scenarios:
+    single_file   one large ROM through download_sftp_file        (MB/s)
+    compressible_file  an uncompressed, padded cartridge dump, same path (MB/s)
+    many_small    a flat folder of small files via download_sftp_folder (files/s, MB/s)
+    deep_folder   a nested multi-disc style tree via download_sftp_folder (files/s, MB/s)
+    listing       _load_files_thread on a folder with many entries (ms)
+
+With --local, the single_file/many_small/deep_folder trees are also copied
+through the SMB/local paths (download_with_progress and
+download_folder_with_progress) with the served folder as the share.
+
+With --http, the single_file/many_small/deep_folder/listing scenarios also run
+against a local HTTP server (see http_server.py) at each latency, once
+answering PROPFIND like a WebDAV share and once with autoindex pages only,
+through download_http_file (segmented Range requests) and
+download_folder_with_progress. Each run reports how many connections the
+keep-alive pool opened for how many requests.
+
+With --exec, every link profile is run a second time against a server that
+allows exec channels, so the folder scenarios take the tar stream path.
+
+SSH tuning (cipher probe, window/packet sizes, zlib for compressible files) is
+on; each link reports the negotiated cipher and the probe's per-cipher rates.
+With --untuned, every link is also run on plain paramiko defaults for comparison.
+
+Runs without a display: the app is built headless (see benchutil.headless_app).
+"""
+import argparse
+import itertools
+import os
+import platform
+import shutil
+import sys
+import time
+
+import benchutil
+from http_server import LocalHTTPServer
+from sftp_server import LocalSFTPServer
+
+SCENARIOS = ("single_file", "compressible_file", "many_small", "deep_folder", "listing")
+
+
+def _write_random(path, size):
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            chunk = min(remaining, 4 * 1024 * 1024)
+            f.write(os.urandom(chunk))
+            remaining -= chunk
+
+
+def _write_padded(path, size):
+    """Like a cartridge dump: random code/data blocks between long runs of 0xFF padding."""
+    with open(path, "wb") as f:
+        for _ in range(size // (64 * 1024)):
+            f.write(os.urandom(16 * 1024) + b"\xff" * (48 * 1024))
+
+
+def make_tree(root, args):
+    """Generate the served ROM tree once; incompressible data so compression can't flatter results."""
+    os.makedirs(os.path.join(root, "single"), exist_ok=True)
+    _write_random(os.path.join(root, "single", "Big Game (USA).iso"), args.large_mb * 1024 * 1024)
+    os.makedirs(os.path.join(root, "padded"), exist_ok=True)
+    _write_padded(os.path.join(root, "padded", "Padded Game (USA).sfc"), args.large_mb * 1024 * 1024)
+
+    small = os.path.join(root, "small")
+    os.makedirs(small, exist_ok=True)
+    for i in range(args.small_files):
+        _write_random(os.path.join(small, f"Game {i:05d} (USA).zip"), args.small_kb * 1024)
+
+    def build(path, depth):
+        os.makedirs(path, exist_ok=True)
+        for i in range(args.files_per_dir):
+            _write_random(os.path.join(path, f"Track {i:02d}.bin"), args.deep_kb * 1024)
+        if depth < args.depth:
+            for i in range(args.fanout):
+                build(os.path.join(path, f"Disc {i + 1}"), depth + 1)
+    build(os.path.join(root, "deep"), 1)
+
+    listing = os.path.join(root, "list")
+    os.makedirs(listing, exist_ok=True)
+    for i in range(args.list_entries):
+        with open(os.path.join(listing, f"Title {i:06d} (Europe).chd"), "wb") as f:
+            f.truncate(1024 * 1024)
+
+
+def tree_stats(path):
+    files = size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            files += 1
+            size += os.path.getsize(os.path.join(dirpath, name))
+    return files, size
+
+
+def bench_link(app, root, server, served, scratch, scenarios, repeat):
+    """Run the selected scenarios against one server and return their results."""
+    probe = None
+    if app.SSH_TUNING:
+        # Probe up front (the app does it in the background on first connect) so
+        # every scenario runs on the chosen cipher
+        app._load_ssh_tuning().clear()
+        start = time.perf_counter()
+        tuning = app._tune_ssh_host(server.connection_info())
+        probe = {'ms': (time.perf_counter() - start) * 1000,
+                 'mb_per_s': {label: rate / (1024 * 1024) for label, rate in tuning.get('rates', {}).items()}}
+    app._link_rate = None
+    if not app.connect_sftp(server.connection_info()):
+        raise RuntimeError("could not connect to the local SFTP server")
+    app.connection_type = "sftp"
+    app.cancel_download_flag = False
+    out = os.path.join(scratch, "out")
+    results = {'cipher_probe': probe} if probe else {}
+
+    def flush():
+        # Drain the status/progress callbacks the transfer queued for the main loop
+        root.update()
+
+    for name, folder, filename in (("single_file", "single", "Big Game (USA).iso"),
+                                   ("compressible_file", "padded", "Padded Game (USA).sfc")):
+        if name not in scenarios:
+            continue
+        files, size = tree_stats(os.path.join(served, folder))
+        mbps, seconds = [], []
+        for _ in range(repeat):
+            os.makedirs(out, exist_ok=True)
+            dest = os.path.join(out, filename)
+            start = time.perf_counter()
+            app.download_sftp_file(server.remote_path(f"{folder}/{filename}"), dest, filename, 1, 1)
+            elapsed = time.perf_counter() - start
+            if os.path.getsize(dest) != size:
+                raise RuntimeError(f"{name}: incomplete download")
+            seconds.append(elapsed)
+            mbps.append(size / (1024 * 1024) / elapsed)
+            shutil.rmtree(out)
+            flush()
+        results[name] = {'bytes': size,
+                         'mb_per_s': benchutil.percentiles(mbps),
+                         'seconds': benchutil.percentiles(seconds)}
+
+    for name, folder in (("many_small", "small"), ("deep_folder", "deep")):
+        if name not in scenarios:
+            continue
+        files, size = tree_stats(os.path.join(served, folder))
+        mbps, fps, seconds = [], [], []
+        for _ in range(repeat):
+            dest = os.path.join(out, folder)
+            start = time.perf_counter()
+            app.download_sftp_folder(server.remote_path(folder), dest, folder, 1, 1)
+            elapsed = time.perf_counter() - start
+            if tree_stats(dest) != (files, size):
+                raise RuntimeError(f"{name}: incomplete download")
+            seconds.append(elapsed)
+            mbps.append(size / (1024 * 1024) / elapsed)
+            fps.append(files / elapsed)
+            shutil.rmtree(out)
+            flush()
+        results[name] = {'files': files, 'bytes': size,
+                         'mb_per_s': benchutil.percentiles(mbps),
+                         'files_per_s': benchutil.percentiles(fps),
+                         'seconds': benchutil.percentiles(seconds)}
+
+    if "listing" in scenarios:
+        app.network_path = server.remote_path("list")
+        samples = []
+        for _ in range(repeat):
+            samples.append(benchutil.time_ms(app._load_files_thread))
+            flush()
+        results["listing"] = {'entries': len(os.listdir(os.path.join(served, "list"))),
+                              'ms': benchutil.percentiles(samples)}
+
+    transport = app.ssh_client.get_transport()
+    results["ssh"] = {'cipher': transport.remote_cipher, 'mac': transport.remote_mac,
+                      'compression': transport.remote_compression}
+    app.disconnect_sftp()
+    return results
+
+
+def bench_local(app, root, served, scratch, scenarios, repeat):
+    """Copy the same trees through the SMB/local code paths."""
+    app.connection_type = "smb"
+    app.cancel_download_flag = False
+    out = os.path.join(scratch, "out")
+    jobs = (("single_file", "single", app.download_with_progress, "Big Game (USA).iso"),
+            ("many_small", "small", app.download_folder_with_progress, None),
+            ("deep_folder", "deep", app.download_folder_with_progress, None))
+    results = {}
+    for name, folder, copy, filename in jobs:
+        if name not in scenarios:
+            continue
+        source = os.path.join(served, folder, filename) if filename else os.path.join(served, folder)
+        files, size = tree_stats(os.path.join(served, folder))
+        mbps, fps = [], []
+        for _ in range(repeat):
+            os.makedirs(out, exist_ok=True)
+            start = time.perf_counter()
+            copy(source, os.path.join(out, filename or folder), filename or folder, 1, 1)
+            elapsed = time.perf_counter() - start
+            mbps.append(size / (1024 * 1024) / elapsed)
+            fps.append(files / elapsed)
+            shutil.rmtree(out)
+            root.update()
+        results[name] = {'files': files, 'bytes': size,
+                         'mb_per_s': benchutil.percentiles(mbps),
+                         'files_per_s': benchutil.percentiles(fps)}
+    return results
+
+
+def bench_http(app, root, server, served, scratch, scenarios, repeat):
+    """Run the selected scenarios against the HTTP server through the http backend."""
+    info = app.parse_http_url(server.url("/"))
+    if app.connect_http(info) is None:
+        raise RuntimeError("could not connect to the local HTTP server")
+    app.connection_type = "http"
+    app.cancel_download_flag = False
+    out = os.path.join(scratch, "out")
+    jobs = (("single_file", "single", app.download_http_file, "Big Game (USA).iso"),
+            ("many_small", "small", app.download_folder_with_progress, None),
+            ("deep_folder", "deep", app.download_folder_with_progress, None))
+    results = {}
+    for name, folder, copy, filename in jobs:
+        if name not in scenarios:
+            continue
+        source = f"/{folder}/{filename}" if filename else f"/{folder}"
+        files, size = tree_stats(os.path.join(served, folder))
+        mbps, fps = [], []
+        for _ in range(repeat):
+            os.makedirs(out, exist_ok=True)
+            dest = os.path.join(out, filename or folder)
+            start = time.perf_counter()
+            copy(source, dest, filename or folder, 1, 1)
+            elapsed = time.perf_counter() - start
+            if tree_stats(out) != (files, size):
+                raise RuntimeError(f"{name}: incomplete download")
+            mbps.append(size / (1024 * 1024) / elapsed)
+            fps.append(files / elapsed)
+            shutil.rmtree(out)
+            root.update()
+        results[name] = {'files': files, 'bytes': size,
+                         'mb_per_s': benchutil.percentiles(mbps),
+                         'files_per_s': benchutil.percentiles(fps)}
+
+    if "listing" in scenarios:
+        app.network_path = "/list"
+        samples = []
+        for _ in range(repeat):
+            samples.append(benchutil.time_ms(app._load_files_thread))
+            root.update()
+        results["listing"] = {'entries': len(os.listdir(os.path.join(served, "list"))),
+                              'ms': benchutil.percentiles(samples)}
+
+    pool = app._http_pool
+    results["pool"] = {'connections': pool.opened, 'requests': pool.requests,
+                       'server_connections': server.counts['connections']}
+    app.disconnect_http()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 20],
+                        help="round-trip latencies to inject (default 0 20)")
+    parser.add_argument("--bandwidth-mbps", type=float, nargs="+", default=[0],
+                        help="link rates in MB/s to inject, 0 = unlimited (default 0)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--large-mb", type=int, default=64, help="size of the single_file ROM")
+    parser.add_argument("--small-files", type=int, default=500)
+    parser.add_argument("--small-kb", type=int, default=64)
+    parser.add_argument("--depth", type=int, default=4, help="deep_folder nesting depth")
+    parser.add_argument("--fanout", type=int, default=3, help="deep_folder subfolders per level")
+    parser.add_argument("--files-per-dir", type=int, default=4)
+    parser.add_argument("--deep-kb", type=int, default=256)
+    parser.add_argument("--list-entries", type=int, default=5000)
+    parser.add_argument("--local", action="store_true", help="also benchmark the SMB/local copy paths")
+    parser.add_argument("--http", action="store_true",
+                        help="also benchmark an HTTP source (WebDAV and autoindex listings)")
+    parser.add_argument("--exec", action="store_true",
+                        help="also run each link with exec allowed (tar folder downloads)")
+    parser.add_argument("--untuned", action="store_true",
+                        help="also run each link with SSH tuning off (paramiko defaults)")
+    benchutil.add_common_args(parser)
+    args = parser.parse_args()
+
+    scratch = benchutil.isolate_home()
+    rd = benchutil.import_app()
+    if not rd._load_paramiko():
+        sys.exit("paramiko is required for the transfer benchmarks")
+
+    served = os.path.join(scratch, "served")
+    print("Generating ROM trees...", file=sys.stderr)
+    make_tree(served, args)
+
+    app, root = benchutil.headless_app(rd)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'app_version': rd.APP_VERSION,
+        'paramiko': rd.paramiko.__version__,
+        'links': {},
+    }
+    exec_modes = (False, True) if args.exec else (False,)
+    tuning_modes = (True, False) if args.untuned else (True,)
+    for latency, bandwidth, allow_exec, tuned in itertools.product(args.latency_ms, args.bandwidth_mbps,
+                                                                   exec_modes, tuning_modes):
+        label = f"rtt{latency:g}ms_" + (f"{bandwidth:g}MBps" if bandwidth else "unlimited")
+        label += "_exec" if allow_exec else ""
+        label += "" if tuned else "_untuned"
+        print(f"Benchmarking {label}...", file=sys.stderr)
+        app._exec_unsupported.clear()
+        app.SSH_TUNING = tuned
+        with LocalSFTPServer(served, latency_ms=latency, bandwidth_mbps=bandwidth or None,
+                             allow_exec=allow_exec) as server:
+            report['links'][label] = bench_link(app, root, server, served, scratch,
+                                                args.scenarios, args.repeat)
+    if args.http:
+        report['http'] = {}
+        for latency, webdav in itertools.product(args.latency_ms, (True, False)):
+            label = f"rtt{latency:g}ms_" + ("webdav" if webdav else "autoindex")
+            print(f"Benchmarking HTTP {label}...", file=sys.stderr)
+            with LocalHTTPServer(served, webdav=webdav, latency_ms=latency) as server:
+                report['http'][label] = bench_http(app, root, server, served, scratch,
+                                                   args.scenarios, args.repeat)
+    if args.local:
+        print("Benchmarking local copies...", file=sys.stderr)
+        report['local'] = bench_local(app, root, served, scratch, args.scenarios, args.repeat)
+    root.destroy()
+
+    benchutil.finish(report, args, higher_is_better=("mb_per_s", "files_per_s"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Shared helpers for the ROM Downloader benchmarks."""
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_SCRIPT = os.path.join(REPO_ROOT, "romdownloader.py")
+
+
+def percentiles(samples):
+    """Summarise a list of timings (ms) as n/mean/p50/p90/p99/max."""
+    if not samples:
+        return {'n': 0}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+    return {
+        'n': len(ordered),
+        'mean': round(statistics.fmean(ordered), 3),
+        'p50': round(pick(50), 3),
+        'p90': round(pick(90), 3),
+        'p99': round(pick(99), 3),
+        'max': round(ordered[-1], 3),
+    }
+
+
+def time_ms(fn, *args, **kwargs):
+    """Run fn once and return its wall time in milliseconds."""
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def isolate_home():
+    """Point HOME at a scratch dir so benchmarks never touch the real config/history."""
+    home = tempfile.mkdtemp(prefix="romdl-bench-home-")
+    os.environ["HOME"] = home
+    os.environ["ROMDL_NO_AUTO_INSTALL"] = "1"
+    return home
+
+
+def import_app():
+    """Import romdownloader from the repo root (call isolate_home() first)."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    import romdownloader
+    return romdownloader
+
+
+class HeadlessRoot:
+    """Stands in for tk.Tk without a display: after() callbacks run on update(), like the main loop."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._next_id = 0
+        self._lock = threading.Lock()  # Worker threads schedule UI updates too
+
+    def after(self, ms, func=None, *args):
+        if func is None:
+            time.sleep(ms / 1000)
+            return None
+        with self._lock:
+            self._next_id += 1
+            job = f"after#{self._next_id}"
+            self._jobs[job] = (func, args)
+        return job
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, job):
+        with self._lock:
+            self._jobs.pop(job, None)
+
+    def update(self):
+        """Run the callbacks queued so far (ones they queue wait for the next update)."""
+        with self._lock:
+            jobs, self._jobs = self._jobs, {}
+        for func, args in jobs.values():
+            func(*args)
+
+    update_idletasks = update
+
+    def destroy(self):
+        self._jobs.clear()
+
+
+class _NullWidget:
+    """Accepts any widget call and does nothing; answers like an empty, unmapped widget."""
+
+    _RESULTS = {'get': '', 'size': 0, 'curselection': ()}
+
+    def __getattr__(self, name):
+        result = 0 if name.startswith('winfo_') else self._RESULTS.get(name)
+        return lambda *args, **kwargs: result
+
+
+# Widgets build_ui creates that the transfer paths update (box art stays off)
+_WIDGETS = ("back_btn", "browse_btn", "cancel_btn", "change_login_btn", "connect_btn",
+            "console_label", "dest_entry", "disk_space_label", "download_btn", "file_listbox",
+            "open_btn", "path_entry", "progress_canvas", "search_entry", "selected_label",
+            "status_label", "version_label", "auto_connect_var", "auto_refresh_var",
+            "extract_archives_var")
+
+
+def headless_app(rd):
+    """A ROMDownloader without a window, for benchmarks that only time transfer code.
+
+    Needs no display: the state comes from ROMDownloader._init_state and the
+    widgets are no-op stand-ins, so status and progress updates cost the same
+    bookkeeping but draw nothing. Call root.update() to drain them.
+    """
+    app = rd.ROMDownloader.__new__(rd.ROMDownloader)
+    app.root = HeadlessRoot()
+    app._init_state()
+    for name in _WIDGETS:
+        setattr(app, name, _NullWidget())
+    app.progress_rect = None
+    app._stall_watch_job = None
+    return app, app.root
+
+
+def add_common_args(parser):
+    parser.add_argument("--repeat", type=int, default=5, help="samples per measurement")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="previous JSON report to compare p50s against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="fail if a p50 exceeds baseline * threshold (default 1.25)")
+
+
+def _walk_p50(report, prefix=""):
+    if isinstance(report, dict):
+        if 'p50' in report:
+            yield prefix, report['p50']
+        for key, value in report.items():
+            yield from _walk_p50(value, f"{prefix}/{key}" if prefix else str(key))
+
+
+def finish(report, args, higher_is_better=()):
+    """Write the report and, with --baseline, exit 1 on regressions.
+
+    Keys containing any of higher_is_better (e.g. "mb_per_s") regress when
+    they drop rather than when they grow.
+    """
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if not args.baseline:
+        return
+    with open(args.baseline) as f:
+        baseline = dict(_walk_p50(json.load(f)))
+    regressions = []
+    for key, value in _walk_p50(report):
+        old = baseline.get(key)
+        if not old:
+            continue
+        if any(marker in key for marker in higher_is_better):
+            if value * args.threshold < old:
+                regressions.append(f"{key}: {old} -> {value}")
+        elif value > old * args.threshold:
+            regressions.append(f"{key}: {old} -> {value}")
+    if regressions:
+        print("Regressions vs baseline:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,237 @@
+"""Local HTTP / WebDAV stand-in for the app's http(s):// sources (no network needed).
+
+    with LocalHTTPServer("/tmp/roms", webdav=True, latency_ms=20) as server:
+        url = server.url("/")          # http://127.0.0.1:PORT/ (webdav://... with scheme="webdav")
+
+Serves a local directory tree with http.server over HTTP/1.1 keep-alive, with
+what the app relies on: Range requests (206), Accept-Ranges, ETag and
+Last-Modified on GET/HEAD, and directory index pages like Apache's autoindex.
+With webdav=True it also answers PROPFIND (Depth 0/1) with a multistatus;
+without, PROPFIND gets 405 like a plain web server. auth=True requires Basic
+auth with USERNAME/PASSWORD.
+
+latency_ms delays every response by that much (one round trip per request),
+so the cost of listings, HEADs and new connections shows up the way it does
+against a remote server. The server counts connections and requests, which
+shows how well the client's keep-alive pool reuses connections.
+"""
+import base64
+import email.utils
+import html
+import http.server
+import os
+import threading
+import time
+import urllib.parse
+
+USERNAME = "bench"
+PASSWORD = "bench"
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.owner._count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def translate_path(self, path):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(path).path)
+        path = os.path.normpath("/" + path).lstrip("/")
+        return os.path.join(self.server.owner.root, path)
+
+    def _begin(self):
+        """Common request preamble: count, delay, auth. False if the request was answered already."""
+        owner = self.server.owner
+        owner._count("requests")
+        if owner.latency:
+            time.sleep(owner.latency)
+        if owner.auth:
+            expected = "Basic " + base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+            if self.headers.get("Authorization") != expected:
+                self._drain()
+                self.send_response(401)
+                self.send_header("WWW-Authenticate", 'Basic realm="roms"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return False
+        return True
+
+    def _drain(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+    def do_HEAD(self):
+        if self._begin():
+            self._serve(head=True)
+
+    def do_GET(self):
+        if self._begin():
+            self._serve(head=False)
+
+    def _serve(self, head):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith("/"):
+                self.send_response(301)
+                self.send_header("Location", urllib.parse.urlsplit(self.path).path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = self._index(path).encode("utf-8")
+            self._reply(200, body, "text/html; charset=utf-8", head)
+            return
+        try:
+            f = open(path, "rb")
+        except OSError:
+            self._reply(404, b"", "text/plain", head)
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            start, end, status = 0, st.st_size, 200
+            wanted = self.headers.get("Range", "")
+            if wanted.startswith("bytes="):
+                first, _, last = wanted[6:].partition("-")
+                try:
+                    start = int(first)
+                    end = min(int(last) + 1, st.st_size) if last else st.st_size
+                except ValueError:
+                    start, end = 0, st.st_size
+                else:
+                    if start >= st.st_size or start >= end:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{st.st_size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    status = 206
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(end - start))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", f'"{st.st_mtime_ns:x}-{st.st_size:x}"')
+            self.send_header("Last-Modified", email.utils.formatdate(st.st_mtime, usegmt=True))
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end - 1}/{st.st_size}")
+            self.end_headers()
+            if head:
+                return
+            f.seek(start)
+            remaining = end - start
+            try:
+                while remaining > 0:
+                    data = f.read(min(remaining, 256 * 1024))
+                    if not data:
+                        break
+                    self.wfile.write(data)
+                    remaining -= len(data)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+    def _index(self, path):
+        """An autoindex-style page: sort links, a parent link, then one link per entry."""
+        here = urllib.parse.urlsplit(self.path).path
+        rows = ['<a href="?C=N;O=D">Name</a> <a href="?C=S;O=A">Size</a>', '<a href="../">Parent Directory</a>']
+        for name in sorted(os.listdir(path)):
+            suffix = "/" if os.path.isdir(os.path.join(path, name)) else ""
+            rows.append(f'<a href="{urllib.parse.quote(name)}{suffix}">{html.escape(name)}{suffix}</a>')
+        return (f"<html><head><title>Index of {html.escape(here)}</title></head><body>"
+                f"<h1>Index of {html.escape(here)}</h1><pre>" + "\n".join(rows) + "</pre></body></html>")
+
+    def _reply(self, status, body, content_type, head=False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def do_PROPFIND(self):
+        if not self._begin():
+            return
+        self._drain()
+        if not self.server.owner.webdav:
+            self._reply(405, b"", "text/plain")
+            return
+        path = self.translate_path(self.path)
+        if not os.path.exists(path):
+            self._reply(404, b"", "text/plain")
+            return
+        href = urllib.parse.urlsplit(self.path).path
+        entries = [(href, path)]
+        if os.path.isdir(path) and self.headers.get("Depth", "1") != "0":
+            base = href.rstrip("/") + "/"
+            entries += [(base + urllib.parse.quote(name), os.path.join(path, name))
+                        for name in sorted(os.listdir(path))]
+        parts = ['<?xml version="1.0" encoding="utf-8"?><D:multistatus xmlns:D="DAV:">']
+        for entry_href, entry_path in entries:
+            st = os.stat(entry_path)
+            is_dir = os.path.isdir(entry_path)
+            props = ("<D:resourcetype><D:collection/></D:resourcetype>" if is_dir else
+                     f"<D:resourcetype/><D:getcontentlength>{st.st_size}</D:getcontentlength>")
+            props += f"<D:getlastmodified>{email.utils.formatdate(st.st_mtime, usegmt=True)}</D:getlastmodified>"
+            if is_dir and not entry_href.endswith("/"):
+                entry_href += "/"
+            parts.append(f"<D:response><D:href>{html.escape(entry_href)}</D:href><D:propstat>"
+                         f"<D:prop>{props}</D:prop><D:status>HTTP/1.1 200 OK</D:status>"
+                         f"</D:propstat></D:response>")
+        parts.append("</D:multistatus>")
+        self._reply(207, "".join(parts).encode("utf-8"), 'application/xml; charset="utf-8"')
+
+
+class LocalHTTPServer:
+    """Threaded HTTP/1.1 server on 127.0.0.1 serving root (see module docstring)."""
+
+    def __init__(self, root, webdav=True, latency_ms=0.0, auth=False):
+        self.root = os.path.realpath(root)
+        self.webdav = webdav
+        self.latency = latency_ms / 1000.0
+        self.auth = auth
+        self.counts = {"connections": 0, "requests": 0}
+        self._lock = threading.Lock()
+        self._server = None
+        self.port = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def url(self, path="/", scheme="http"):
+        login = f"{USERNAME}:{PASSWORD}@" if self.auth else ""
+        return f"{scheme}://{login}127.0.0.1:{self.port}{urllib.parse.quote(path)}"
+
+    def start(self):
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+if __name__ == "__main__":
+    import sys
+    root = sys.argv[1] if len(sys.argv) > 1 else "."
+    with LocalHTTPServer(root) as server:
+        print(f"Serving {root} at {server.url()} (webdav://127.0.0.1:{server.port}/) - Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass